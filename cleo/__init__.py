@@ -1,17 +1,8 @@
 """Contains core classes and functions for the Cleo package."""
 from __future__ import annotations
 
-# auto-import submodules
-import cleo.coords
-import cleo.ephys
-import cleo.imaging
-import cleo.ioproc
-import cleo.opto
-import cleo.recorders
-import cleo.registry
-import cleo.stimulators
-import cleo.utilities
-import cleo.viz
+import importlib
+
 from cleo.base import (
     CLSimulator,
     InterfaceDevice,
@@ -22,3 +13,30 @@ from cleo.base import (
     SynapseDevice,
 )
 from cleo.ioproc import LatencyIOProcessor
+
+# submodules are imported on first access (e.g., ``cleo.ephys``), so that
+# ``import cleo`` doesn't pay for dependencies of submodules that aren't used
+_submodules = {
+    "coords",
+    "ephys",
+    "imaging",
+    "ioproc",
+    "light",
+    "opto",
+    "recorders",
+    "registry",
+    "stimulators",
+    "utilities",
+    "viz",
+}
+
+
+def __getattr__(name: str):
+    if name in _submodules:
+        # also sets the submodule as an attribute, so this is only called once
+        return importlib.import_module(f"cleo.{name}")
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(set(globals()) | _submodules)
@@ -210,7 +210,14 @@ def coords_from_xyz(x: Quantity, y: Quantity, z: Quantity) -> Quantity:
 
 def coords_from_ng(ng: NeuronGroup) -> Quantity:
     """Get (n, 3) coordinate array from NeuronGroup."""
-    return coords_from_xyz(ng.x, ng.y, ng.z)
+    return _unitless_coords_from_ng(ng) * meter
+
+
+def _unitless_coords_from_ng(ng: NeuronGroup) -> np.ndarray:
+    """Get (n, 3) coordinate array from NeuronGroup, in meters without units."""
+    # not cached since coordinates can be reassigned at any time.
+    # reading unitless values (x_ etc.) avoids Quantity arithmetic on each array
+    return np.column_stack([ng.x_[:], ng.y_[:], ng.z_[:]])
 
 
 def _init_variables(group: Group):
@@ -257,5 +264,10 @@ def concat_coords(*coords: Quantity) -> Quantity:
     Quantity
         A single n x 3 combined Quantity array
     """
-    out = np.vstack([c / mm for c in coords])
-    return out * mm
+    coords = [np.reshape(c / meter, (-1, 3)) for c in coords]
+    out = np.empty((sum(len(c) for c in coords), 3))
+    i_start = 0
+    for c in coords:
+        out[i_start : i_start + len(c)] = c
+        i_start += len(c)
+    return out * meter
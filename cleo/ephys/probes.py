@@ -6,13 +6,12 @@ from typing import Any, Tuple
 
 import neo
 from attrs import define, field
-from brian2 import NeuronGroup, Quantity, Unit, mm, np, umeter
+from brian2 import NeuronGroup, Quantity, Unit, meter, mm, np, umeter
 from matplotlib.artist import Artist
 from mpl_toolkits.mplot3d.axes3d import Axes3D
 
 from cleo.base import NeoExportable, Recorder
-from cleo.coords import concat_coords
-from cleo.utilities import get_orth_vectors_for_V
+from cleo.utilities import _cached_orth_vectors
 
 
 @define(eq=False)
@@ -156,7 +155,8 @@ class Probe(Recorder, NeoExportable):
         """
         for signal in self.signals:
             signal.connect_to_neuron_group(neuron_group, **kwparams)
-            self.brian_objects.update(signal.brian_objects)
+        # collect all signals' objects in one update after connecting
+        self.brian_objects.update(*(signal.brian_objects for signal in self.signals))
 
     def get_state(self) -> dict:
         """Get current state from probe, i.e., all signals
@@ -278,8 +278,9 @@ def linear_shank_coords(
         represent x, y, and z
     """
     dir_uvec = direction / np.linalg.norm(direction)
-    end_location = start_location + array_length * dir_uvec
-    return np.linspace(start_location, end_location, channel_count)
+    start_location = _strip_m(start_location)
+    end_location = start_location + float(array_length / meter) * dir_uvec
+    return np.linspace(start_location, end_location, channel_count) * meter
 
 
 def tetrode_shank_coords(
@@ -319,7 +320,8 @@ def tetrode_shank_coords(
         represent x, y, and z
     """
     dir_uvec = direction / np.linalg.norm(direction)
-    end_location = start_location + array_length * dir_uvec
+    start_location = _strip_m(start_location)
+    end_location = start_location + float(array_length / meter) * dir_uvec
     center_locs = np.linspace(start_location, end_location, tetrode_count)
     # need to add coords around the center locations
     # tetrode_width is the length of one side of the square, so the diagonals
@@ -327,10 +329,14 @@ def tetrode_shank_coords(
     #    x      -dir*width/sqrt(2)
     # x  .  x   +/- orth*width/sqrt(2)
     #    x      +dir*width/sqrt(2)
-    orth_uvec, _ = get_orth_vectors_for_V(dir_uvec)
-    return np.repeat(center_locs, 4, axis=0) + tetrode_width / np.sqrt(2) * np.tile(
-        np.vstack([-dir_uvec, -orth_uvec, orth_uvec, dir_uvec]), (tetrode_count, 1)
+    orth_uvec, _ = _cached_orth_vectors(tuple(dir_uvec))
+    offsets = (
+        float(tetrode_width / meter)
+        / np.sqrt(2)
+        * np.vstack([-dir_uvec, -orth_uvec, orth_uvec, dir_uvec])
     )
+    out = center_locs[:, np.newaxis, :] + offsets  # (tetrode, contact, xyz)
+    return out.reshape(-1, 3) * meter
 
 
 def poly2_shank_coords(
@@ -368,14 +374,15 @@ def poly2_shank_coords(
         represent x, y, and z
     """
     dir_uvec = direction / np.linalg.norm(direction)
-    end_location = start_location + array_length * dir_uvec
+    start_location = _strip_m(start_location)
+    end_location = start_location + float(array_length / meter) * dir_uvec
     out = np.linspace(start_location, end_location, channel_count)
-    orth_uvec, _ = get_orth_vectors_for_V(dir_uvec)
+    orth_uvec, _ = _cached_orth_vectors(tuple(dir_uvec))
     # place contacts on alternating sides of the central axis
-    even_channels = np.arange(channel_count) % 2 == 0
-    out[even_channels] += intercol_space / 2 * orth_uvec
-    out[~even_channels] -= intercol_space / 2 * orth_uvec
-    return out
+    offset = float(intercol_space / meter) / 2 * orth_uvec
+    out[0::2] += offset
+    out[1::2] -= offset
+    return out * meter
 
 
 def poly3_shank_coords(
@@ -418,25 +425,34 @@ def poly3_shank_coords(
     # makes middle column longer if not even. Nothing fancier.
     # length measures middle column
     dir_uvec = direction / np.linalg.norm(direction)
+    start_location = _strip_m(start_location)
+    array_length = float(array_length / meter)
+    intercol_space = float(intercol_space / meter)
     end_location = start_location + array_length * dir_uvec
     center_loc = start_location + array_length * dir_uvec / 2
     n_middle = channel_count // 3 + channel_count % 3
-    n_side = int((channel_count - n_middle) / 2)
+    n_side = (channel_count - n_middle) // 2
 
-    middle = np.linspace(start_location, end_location, n_middle)
+    cols = np.empty((n_middle + 2 * n_side, 3))
+    cols[:n_middle] = np.linspace(start_location, end_location, n_middle)
 
     spacing = array_length / n_middle
     side_length = n_side * spacing
-    orth_uvec, _ = get_orth_vectors_for_V(dir_uvec)
+    orth_uvec, _ = _cached_orth_vectors(tuple(dir_uvec))
     side = np.linspace(
         center_loc - dir_uvec * side_length / 2,
         center_loc + dir_uvec * side_length / 2,
         n_side,
     )
-    side1 = side + orth_uvec * intercol_space
-    side2 = side - orth_uvec * intercol_space
-    out = concat_coords(middle, side1, side2)
-    return out[out[:, 2].argsort()]  # sort to return superficial -> deep
+    cols[n_middle : n_middle + n_side] = side + orth_uvec * intercol_space
+    cols[n_middle + n_side :] = side - orth_uvec * intercol_space
+    # stable sort to return superficial -> deep, with ties going to the
+    # earlier column (middle, then side 1, then side 2)
+    return cols[np.argsort(cols[:, 2], kind="stable")] * meter
+
+
+def _strip_m(location: Quantity) -> np.ndarray:
+    return np.asarray(location / meter, dtype=np.float64).reshape(3)
 
 
 def tile_coords(coords: Quantity, num_tiles: int, tile_vector: Quantity) -> Quantity:
@@ -462,7 +478,14 @@ def tile_coords(coords: Quantity, num_tiles: int, tile_vector: Quantity) -> Quan
     """
     num_coords = coords.shape[0]
     # num_tiles X 3
-    offsets = np.linspace((0, 0, 0) * mm, tile_vector, num_tiles)
-    # num_coords X num_tiles X 3
-    out = np.tile(coords[:, np.newaxis, :], (1, num_tiles, 1)) + offsets
-    return out.reshape((num_coords * num_tiles, 3), order="F")
+    offsets = np.linspace((0, 0, 0), tile_vector / meter, num_tiles)
+    base = np.asarray(coords / meter)
+    # write each tile directly into its block of the output
+    out = np.empty((num_coords * num_tiles, 3))
+    for i_tile in range(num_tiles):
+        np.add(
+            base,
+            offsets[i_tile],
+            out=out[i_tile * num_coords : (i_tile + 1) * num_coords],
+        )
+    return out * meter
@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 import warnings
+from collections import defaultdict
 from datetime import datetime
 from typing import Callable
 
@@ -14,11 +15,15 @@ from matplotlib.artist import Artist
 from mpl_toolkits.mplot3d import Axes3D
 
 from cleo.base import Recorder
-from cleo.coords import coords_from_ng
+from cleo.coords import _unitless_coords_from_ng, coords_from_ng
 from cleo.imaging.sensors import Sensor
 from cleo.utilities import (
     analog_signal,
+    get_num_threads,
+    njit,
     normalize_coords,
+    numba_available,
+    prange,
     rng,
     unit_safe_append,
     unit_safe_cat,
@@ -63,34 +68,161 @@ def target_neurons_in_plane(
     """
     assert sensor_location in ("cytoplasm", "membrane")
 
-    ng_coords = coords_from_ng(ng)
+    # the kernels work on plain float64 arrays (in meters)
+    ng_coords = np.ascontiguousarray(_unitless_coords_from_ng(ng), dtype=np.float64)
     # Compute the normal vector and the center of the plane
-    plane_normal = scope_direction
-    plane_center = scope_location + plane_normal * scope_focus_depth
-    # Compute the distance of each neuron from the plane
-    perp_distances = np.abs(np.dot(ng_coords - plane_center, plane_normal))
-    noise_focus_factor = np.ones(ng.N)
-    # signal falloff with shrinking cross-section (or circumference)
-    # ignore numpy warning
-    with np.errstate(invalid="ignore"):
-        r_soma_visible = np.sqrt(soma_radius**2 - perp_distances**2)
-    r_soma_visible[np.isnan(r_soma_visible)] = 0
-    if sensor_location == "cytoplasm":
-        relative_num_pixels = (r_soma_visible / soma_radius) ** 2
+    plane_normal = np.asarray(scope_direction, dtype=np.float64)
+    plane_center = np.asarray(scope_location / meter, dtype=np.float64) + (
+        plane_normal * float(scope_focus_depth / meter)
+    )
+    args = (
+        ng_coords,
+        plane_center,
+        plane_normal,
+        float(soma_radius / meter),
+        float(scope_img_width / meter),
+        sensor_location == "cytoplasm",
+    )
+    if not numba_available or len(ng_coords) < _min_n_for_numba:
+        targets = _targets_numpy(*args)
+    elif get_num_threads() > 1:
+        targets = _targets_kernel_parallel(*args)
     else:
-        relative_num_pixels = r_soma_visible / soma_radius
-    with np.errstate(divide="ignore"):
-        noise_focus_factor /= np.sqrt(relative_num_pixels)
+        targets = _targets_kernel(*args)
+    i_targets, noise_focus_factor, coords_on_plane = targets
+
+    return i_targets, noise_focus_factor, coords_on_plane * meter
+
+
+_min_n_for_numba = 1_000_000
+"""Neuron count above which :func:`target_neurons_in_plane` uses the numba
+kernels (if installed). It runs once per injection, and loading the compiled
+kernels takes ~0.5 s on first use (longer when compiling), far more than the
+NumPy version takes for typical groups. Only for groups this large do NumPy's
+time (~0.1 s per million neurons) and its (N, 3) temporaries start to matter."""
+
+
+@njit(cache=True)
+def _target_neuron(
+    ng_coords, i, plane_center, plane_normal, soma_radius, img_width, is_cyto
+):
+    """Per-neuron computation shared by the numba kernels, returning
+    (in_view, noise_focus_factor, x, y, z) with x, y, z on the focal plane."""
+    nx, ny, nz = plane_normal[0], plane_normal[1], plane_normal[2]
+    px, py, pz = plane_center[0], plane_center[1], plane_center[2]
+    dx = ng_coords[i, 0] - px
+    dy = ng_coords[i, 1] - py
+    dz = ng_coords[i, 2] - pz
+    perp = abs(dx * nx + dy * ny + dz * nz)
+    soma_r2 = soma_radius * soma_radius
+    r2_soma_visible = soma_r2 - perp * perp
+    # coords on plane, relative to plane center
+    cx = dx - perp * nx
+    cy = dy - perp * ny
+    cz = dz - perp * nz
+    in_view = r2_soma_visible > 0 and (
+        cx * cx + cy * cy + cz * cz < (img_width / 2) * (img_width / 2)
+    )
+    if not in_view:
+        return False, 0.0, 0.0, 0.0, 0.0
+    if is_cyto:
+        relative_num_pixels = r2_soma_visible / soma_r2
+    else:
+        relative_num_pixels = np.sqrt(r2_soma_visible) / soma_radius
+    return True, 1 / np.sqrt(relative_num_pixels), cx + px, cy + py, cz + pz
+
+
+@njit(cache=True)
+def _targets_kernel(
+    ng_coords, plane_center, plane_normal, soma_radius, img_width, is_cyto
+):
+    """Fused, single-pass version of :func:`_targets_numpy`, compiled with numba.
+    All inputs are unitless (meters)."""
+    n = ng_coords.shape[0]
+    i_targets = np.empty(n, dtype=np.int64)
+    noise_focus_factor = np.empty(n, dtype=np.float64)
+    coords_on_plane = np.empty((n, 3), dtype=np.float64)
+
+    k = 0
+    for i in range(n):
+        in_view, nff, x, y, z = _target_neuron(
+            ng_coords, i, plane_center, plane_normal, soma_radius, img_width, is_cyto
+        )
+        if not in_view:
+            continue
+        i_targets[k] = i
+        noise_focus_factor[k] = nff
+        coords_on_plane[k, 0] = x
+        coords_on_plane[k, 1] = y
+        coords_on_plane[k, 2] = z
+        k += 1
+
+    return i_targets[:k], noise_focus_factor[:k], coords_on_plane[:k]
+
+
+@njit(cache=True, parallel=True)
+def _targets_kernel_parallel(
+    ng_coords, plane_center, plane_normal, soma_radius, img_width, is_cyto
+):
+    """Multithreaded version of :func:`_targets_kernel` for large neuron groups.
+    Since appending targets isn't thread-safe, first computes every neuron in
+    parallel, then gathers those in view."""
+    n = ng_coords.shape[0]
+    in_view = np.empty(n, dtype=np.bool_)
+    nff_all = np.empty(n, dtype=np.float64)
+    coords_all = np.empty((n, 3), dtype=np.float64)
+    for i in prange(n):
+        in_view[i], nff_all[i], x, y, z = _target_neuron(
+            ng_coords, i, plane_center, plane_normal, soma_radius, img_width, is_cyto
+        )
+        coords_all[i, 0] = x
+        coords_all[i, 1] = y
+        coords_all[i, 2] = z
+
+    i_targets = np.flatnonzero(in_view)
+    k = len(i_targets)
+    noise_focus_factor = np.empty(k, dtype=np.float64)
+    coords_on_plane = np.empty((k, 3), dtype=np.float64)
+    for j in prange(k):
+        noise_focus_factor[j] = nff_all[i_targets[j]]
+        for d in range(3):
+            coords_on_plane[j, d] = coords_all[i_targets[j], d]
+
+    return i_targets, noise_focus_factor, coords_on_plane
+
+
+def _targets_numpy(
+    ng_coords, plane_center, plane_normal, soma_radius, img_width, is_cyto
+):
+    """NumPy implementation of :func:`target_neurons_in_plane`, used when numba
+    isn't available. All inputs are unitless (meters)."""
+    # Compute the distance of each neuron from the plane, subtracting the plane
+    # center's projection as a scalar rather than from every coordinate
+    bias = float(plane_center @ plane_normal)
+    perp_distances = np.abs(np.einsum("ij,j->i", ng_coords, plane_normal) - bias)
+    # clip at 0 rather than taking sqrt of negatives for neurons off the plane
+    r_soma_visible = np.sqrt(np.maximum(soma_radius**2 - perp_distances**2, 0))
 
     # get only neurons in view
     coords_on_plane = ng_coords - plane_normal * perp_distances[:, np.newaxis]
-    plane_distances = np.sqrt(np.sum((coords_on_plane - plane_center) ** 2, axis=1))
-
-    i_targets = np.flatnonzero(
-        np.logical_and(r_soma_visible > 0, plane_distances < scope_img_width / 2)
-    )
+    rel_coords_on_plane = coords_on_plane - plane_center
+    # compare squared distances to skip the sqrt
+    plane_dist_sq = np.einsum("ij,ij->i", rel_coords_on_plane, rel_coords_on_plane)
+
+    in_view = r_soma_visible > 0
+    np.logical_and(in_view, plane_dist_sq < (img_width / 2) ** 2, out=in_view)
+    i_targets = np.flatnonzero(in_view)
+
+    # signal falloff with shrinking cross-section (or circumference),
+    # computed only for targets, all of which have r_soma_visible > 0
+    r_soma_visible = r_soma_visible[i_targets]
+    if is_cyto:
+        relative_num_pixels = (r_soma_visible / soma_radius) ** 2
+    else:
+        relative_num_pixels = r_soma_visible / soma_radius
+    noise_focus_factor = 1 / np.sqrt(relative_num_pixels)
 
-    return i_targets, noise_focus_factor[i_targets], coords_on_plane[i_targets]
+    return i_targets, noise_focus_factor, coords_on_plane[i_targets]
 
 
 @define(eq=False)
@@ -157,6 +289,19 @@ class Scope(Recorder):
     )
     """relative expression levels of neurons selected from each injection"""
 
+    _sigma_all: Float[np.ndarray, "{self.n}"] = field(
+        factory=lambda: np.array([]), init=False, repr=False
+    )
+    _injct_slices: list[tuple[NeuronGroup, slice, slice]] = field(
+        factory=list, init=False, repr=False
+    )
+    _signal_buf: Float[np.ndarray, "{self.n}"] = field(
+        factory=lambda: np.array([]), init=False, repr=False
+    )
+    _noise_buf: Float[np.ndarray, "{self.n}"] = field(
+        factory=lambda: np.array([]), init=False, repr=False
+    )
+
     @property
     def n(self) -> int:
         """Number of imaged ROIs"""
@@ -247,29 +392,48 @@ class Scope(Recorder):
         Float[np.ndarray, "{self.n}"]
             Fluorescence values for all targets
         """
-        signal = []
         signal_per_ng = self.sensor.get_state()
         # sensor has just one signal for neuron group, not storing
         # separately for each injection, so we'll recover that here
-        n_prev_targets_for_ng = {}
-        for ng, i_targets in zip(self.neuron_groups, self.i_targets_per_injct):
+        for ng, out_slice, ng_slice in self._injct_slices:
             if ng.name not in signal_per_ng:
                 raise RuntimeError(
                     f"Sensor {self.sensor.name} has no signal for neuron group {ng.name}."
                     " Did you forget to call inject_sensor_for_targets() after scope injections??"
                 )
-            subset_start = n_prev_targets_for_ng.get(ng, 0)
-            subset_for_injct = slice(subset_start, subset_start + len(i_targets))
-            signal.append(signal_per_ng[ng.name][subset_for_injct])
-            n_prev_targets_for_ng[ng] = subset_start + len(i_targets)
-        signal = np.concatenate(signal)
-        noise = rng.normal(0, self.sigma_noise, len(signal))
-        assert self.n == len(signal) == len(noise) == len(self.sigma_noise)
-
-        state = signal + noise
+            self._signal_buf[out_slice] = signal_per_ng[ng.name][ng_slice]
+        assert len(self._signal_buf) == len(self._noise_buf) == len(self._sigma_all)
+        rng.standard_normal(out=self._noise_buf)
+        np.multiply(self._noise_buf, self._sigma_all, out=self._noise_buf)
+
+        # fresh array, since it's kept in history and passed to the IO processor
+        state = self._signal_buf + self._noise_buf
         t_now = self.sim.network.t
         self._update_saved_vars(t_now, state)
-        return signal + noise
+        return state
+
+    def _update_flat_arrays(self) -> None:
+        """Rebuild flat per-target arrays used by :meth:`get_state`, so per-injection
+        lists needn't be concatenated every time step. Called on each injection."""
+        self._sigma_all = np.concatenate(self.sigma_per_injct).astype(np.float64)
+        self._injct_slices = []
+        n_prev_targets_for_ng = {}
+        out_start = 0
+        for ng, i_targets in zip(self.neuron_groups, self.i_targets_per_injct):
+            n_targets = len(i_targets)
+            subset_start = n_prev_targets_for_ng.get(ng, 0)
+            self._injct_slices.append(
+                (
+                    ng,
+                    slice(out_start, out_start + n_targets),
+                    slice(subset_start, subset_start + n_targets),
+                )
+            )
+            n_prev_targets_for_ng[ng] = subset_start + n_targets
+            out_start += n_targets
+        assert out_start == len(self._sigma_all)
+        self._signal_buf = np.empty(out_start)
+        self._noise_buf = np.empty(out_start)
 
     def connect_to_neuron_group(self, neuron_group: NeuronGroup, **kwparams) -> None:
         focus_depth = kwparams.get("focus_depth", self.focus_depth)
@@ -287,18 +451,25 @@ class Scope(Recorder):
                 focus_coords,
             ) = self.target_neurons_in_plane(neuron_group, focus_depth, soma_radius)
             base_sigma = kwparams.get("base_sigma", self.sensor.sigma_noise)
-            sigma_noise = noise_focus_factor * base_sigma
             rho_rel = rho_rel_generator(len(i_targets))
             if self.sensor.dFF_1AP is not None:
-                snr = rho_rel * self.sensor.dFF_1AP / sigma_noise
-                i_targets = i_targets[snr > self.snr_cutoff]
-                sigma_noise = sigma_noise[snr > self.snr_cutoff]
-                focus_coords = focus_coords[snr > self.snr_cutoff]
-                rho_rel = rho_rel[snr > self.snr_cutoff]
+                # snr = rho_rel * dFF_1AP / (noise_focus_factor * base_sigma),
+                # but rearranging snr > snr_cutoff avoids dividing for every neuron
+                # compute integer indices once rather than reapplying a boolean mask
+                i_keep = np.flatnonzero(
+                    noise_focus_factor * (self.snr_cutoff * base_sigma)
+                    < rho_rel * self.sensor.dFF_1AP
+                )
+                i_targets = i_targets[i_keep]
+                noise_focus_factor = noise_focus_factor[i_keep]
+                focus_coords = focus_coords[i_keep]
+                rho_rel = rho_rel[i_keep]
             else:
                 warnings.warn(
                     f"SNR cutoff not used, since {self.sensor.name} does not have dFF_1AP defined."
                 )
+            # only computed for neurons kept
+            sigma_noise = noise_focus_factor * base_sigma
         else:
             i_targets = kwparams.pop("i_targets", neuron_group.i_)
             sigma_noise = kwparams.get("sigma_noise", self.sensor.sigma_noise)
@@ -314,6 +485,7 @@ class Scope(Recorder):
         self.sigma_per_injct.append(sigma_noise)
         self.focus_coords_per_injct.append(focus_coords)
         self.rho_rel_per_injct.append(rho_rel)
+        self._update_flat_arrays()
 
     def i_targets_for_neuron_group(self, neuron_group):
         """can handle multiple injections into same ng"""
@@ -324,23 +496,21 @@ class Scope(Recorder):
         return i_targets_for_ng
 
     def inject_sensor_for_targets(self, **kwparams) -> None:
-        for ng in set(self.neuron_groups):
-            i_targets_for_ng = []
-            rho_rel_for_ng = []
-            for ng_, i_targets, rho_rel in zip(
-                self.neuron_groups, self.i_targets_per_injct, self.rho_rel_per_injct
-            ):
-                if ng_ is not ng:
-                    continue
-
-                i_targets_for_ng.extend(i_targets)
-                rho_rel_for_ng.extend(rho_rel)
-
+        # group targets by neuron group in one pass, preserving injection order
+        i_targets_per_ng = defaultdict(list)
+        rho_rel_per_ng = defaultdict(list)
+        for ng, i_targets, rho_rel in zip(
+            self.neuron_groups, self.i_targets_per_injct, self.rho_rel_per_injct
+        ):
+            i_targets_per_ng[ng].append(np.asarray(i_targets))
+            rho_rel_per_ng[ng].append(np.asarray(rho_rel))
+
+        for ng, i_targets_chunks in i_targets_per_ng.items():
             self.sim.inject(
                 self.sensor,
                 ng,
-                i_targets=i_targets_for_ng,
-                rho_rel=rho_rel_for_ng,
+                i_targets=np.concatenate(i_targets_chunks),
+                rho_rel=np.concatenate(rho_rel_per_ng[ng]),
                 **kwparams,
             )
 
@@ -349,23 +519,19 @@ class Scope(Recorder):
     ) -> list[Artist]:
         color = kwargs.pop("color", "xkcd:fluorescent green")
         snr = np.concatenate(self.sigma_per_injct)
-        coords = (
-            np.concatenate(
-                [
-                    coords_from_ng(ng)[i_targets] / meter
-                    for ng, i_targets in zip(
-                        self.neuron_groups, self.i_targets_per_injct
-                    )
-                ]
-            )
-            * meter
-        )
+        # strip units once, working in axis units from here on
+        m_per_unit = float(axis_scale_unit / meter)
+        # ROI coordinates were already computed on injection
+        coords = np.reshape(self.focus_coords / meter, (-1, 3)) / m_per_unit
         assert coords.shape == (len(snr), 3)
         assert len(snr) == len(coords)
+        location = np.asarray(self.location / meter, dtype=float) / m_per_unit
+        focus_depth = float(self.focus_depth / meter) / m_per_unit
+
         scope_marker = ax.quiver(
-            self.location[0] / axis_scale_unit,
-            self.location[1] / axis_scale_unit,
-            self.location[2] / axis_scale_unit,
+            location[0],
+            location[1],
+            location[2],
             self.direction[0],
             self.direction[1],
             self.direction[2],
@@ -373,14 +539,14 @@ class Scope(Recorder):
             lw=5,
             label=self.name,
             pivot="tail",
-            length=self.focus_depth / axis_scale_unit,
+            length=focus_depth,
             normalize=True,
         )
 
         # Define the center, normal vector, and radius
         normal = self.direction
-        center = self.location + normal * self.focus_depth
-        radius = self.img_width / 2
+        center = location + normal * focus_depth
+        radius = float(self.img_width / meter) / m_per_unit / 2
 
         # Generate the points for the circle
         theta = np.linspace(0, 2 * np.pi, 100)
@@ -389,22 +555,20 @@ class Scope(Recorder):
         phi = np.arccos(normal[2])
         # angle relative to x axis
         theta0 = np.arctan2(normal[1], normal[0])
-        x = center[0] + radius * np.cos(phi) * np.outer(np.cos(theta), r)
-        y = center[1] + radius * np.cos(phi) * np.outer(np.sin(theta), r)
-        z = center[2] + radius * np.sin(phi) * np.outer(-np.cos(theta - theta0), r)
-
-        plane = ax.plot_surface(
-            x / axis_scale_unit,
-            y / axis_scale_unit,
-            z / axis_scale_unit,
-            color=color,
-            alpha=0.2,
+        # broadcast (n_theta, 1) columns against (1, n_r) row
+        r = r[np.newaxis, :]
+        x = center[0] + (radius * np.cos(phi)) * (np.cos(theta)[:, np.newaxis] * r)
+        y = center[1] + (radius * np.cos(phi)) * (np.sin(theta)[:, np.newaxis] * r)
+        z = center[2] + (radius * np.sin(phi)) * (
+            -np.cos(theta - theta0)[:, np.newaxis] * r
         )
 
+        plane = ax.plot_surface(x, y, z, color=color, alpha=0.2)
+
         target_markers = ax.scatter(
-            coords[:, 0] / axis_scale_unit,
-            coords[:, 1] / axis_scale_unit,
-            coords[:, 2] / axis_scale_unit,
+            coords[:, 0],
+            coords[:, 1],
+            coords[:, 2],
             marker="^",
             c=color,
             label=f"{self.sensor.name} ROIs",
@@ -1,6 +1,8 @@
 """Assorted utilities for developers."""
+import importlib.util
 import warnings
 from collections.abc import MutableMapping
+from functools import lru_cache
 
 import brian2.only as b2
 import neo
@@ -15,6 +17,36 @@ from brian2.equations.equations import (
 from brian2.groups.group import get_dtype
 from matplotlib import pyplot as plt
 
+# numba is optional: when installed, some numeric kernels for large inputs are
+# JIT-compiled; otherwise equivalent NumPy implementations are used.
+# importing numba is slow, so it's only imported by modules defining kernels,
+# when they first use njit, prange, or get_num_threads
+numba_available = importlib.util.find_spec("numba") is not None
+
+
+def njit(*args, **kwargs):
+    """:func:`numba.njit` if numba is installed. Otherwise returns the
+    function undecorated, with or without decorator kwargs."""
+    if numba_available:
+        import numba
+
+        return numba.njit(*args, **kwargs)
+    if len(args) == 1 and callable(args[0]):
+        return args[0]
+    return lambda func: func
+
+
+def __getattr__(name: str):
+    # prange and get_num_threads come from numba, imported on first access
+    if name in ("prange", "get_num_threads"):
+        if numba_available:
+            import numba
+
+            return getattr(numba, name)
+        return range if name == "prange" else lambda: 1
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
 rng: np.random.Generator = np.random.default_rng()
 """A central random number generator.
 
@@ -99,6 +131,19 @@ def get_orth_vectors_for_V(V):
     return W1.squeeze(), W2.squeeze()
 
 
+@lru_cache(maxsize=32)
+def _cached_orth_vectors(
+    v: tuple[float, float, float]
+) -> tuple[np.ndarray, np.ndarray]:
+    """:func:`get_orth_vectors_for_V` for a single vector, cached since only a few
+    directions (e.g., of probe shanks) are used in practice.
+    Results are read-only since they are shared between calls."""
+    W1, W2 = get_orth_vectors_for_V(np.array(v, dtype=float))
+    W1.setflags(write=False)
+    W2.setflags(write=False)
+    return W1, W2
+
+
 def xyz_from_rθz(rs, thetas, zs, xyz_start, xyz_end):
     """Convert from cylindrical to Cartesian coordinates."""
     # not using np.linalg.norm because it strips units
@@ -1,7 +1,8 @@
 """Tools for visualizing models and simulations"""
 from __future__ import annotations
 
-from collections.abc import Iterable
+import warnings
+from collections.abc import Callable, Iterable
 from typing import Any, Tuple, Union
 
 import matplotlib.animation as anim
@@ -14,14 +15,19 @@ from brian2 import (
     Quantity,
     SpikeMonitor,
     Unit,
+    meter,
     ms,
+    second,
     um,
 )
 from matplotlib.artist import Artist
+from matplotlib.collections import PathCollection
 from mpl_toolkits.mplot3d import Axes3D
 
 from cleo.base import CLSimulator, InterfaceDevice
+from cleo.coords import _unitless_coords_from_ng
 from cleo.registry import registry_for_sim
+from cleo.utilities import njit, numba_available
 
 _neuron_alpha = 0.2
 
@@ -55,43 +61,140 @@ class VideoVisualizer(InterfaceDevice):
 
     _spike_mons: list[SpikeMonitor] = field(init=False, factory=list)
 
-    _num_old_spikes: list[int] = field(init=False, factory=list)
+    _n_frames: int = field(init=False, default=0, repr=False)
 
-    _value_per_device_per_frame: list[list[Any]] = field(init=False, factory=list)
+    _values_per_device: list[list[Any] | None] = field(
+        init=False, factory=list, repr=False
+    )
+    """for each device, its value at each frame, or None for devices without
+    a value"""
+
+    _spike_offsets_per_ng: list[list[int]] = field(init=False, factory=list, repr=False)
+    """for each neuron group, the number of spikes recorded by the end of each
+    frame (preceded by 0), so frame ``i`` holds spikes
+    ``offsets[i]:offsets[i + 1]`` of the spike monitor"""
+
+    _i_spikes_per_ng: list[np.ndarray] = field(init=False, factory=list, repr=False)
+
+    _neuron_artists: list[Artist] = field(init=False, factory=list, repr=False)
+
+    _device_artists: list[list[Artist]] = field(init=False, factory=list, repr=False)
 
-    _i_spikes_per_ng_per_frame: list[list[np.ndarray]] = field(init=False, factory=list)
+    _rgba_per_ng: list[np.ndarray] = field(init=False, factory=list, repr=False)
+    """RGBA colors of :attr:`fig`'s neuron artists, replaced (not modified)
+    by each call to :meth:`prepare_figure`"""
+
+    _shown_spikes_per_ng: list[np.ndarray] = field(init=False, factory=list, repr=False)
+    """indices of neurons each of :attr:`fig`'s artists currently shows as
+    spiking, so frames only need to reset those rather than the whole alpha
+    column. Replaced along with :attr:`_rgba_per_ng`"""
 
     def init_for_simulator(self, simulator: CLSimulator):
         if self.devices == "all":
             self.devices = list(self.sim.recorders.values())
             self.devices.extend(list(self.sim.stimulators.values()))
+        # one list per device, appended to in place, so snapshots don't
+        # allocate a new container every frame.
+        # not all devices (recorders!) have a value or any changing state to plot,
+        # so check once which do rather than catching AttributeError every frame
+        devices = _unpack_devices(self.devices)
+        self._values_per_device = [
+            [] if hasattr(device, "value") else None for device in devices
+        ]
+        devices_values = [
+            (device, values)
+            for device, values in zip(devices, self._values_per_device)
+            if values is not None
+        ]
+
+        # network op. neuron groups are connected after this, so spikes are
+        # always recorded, but device values only if any have them
+        def snapshot_spikes(t):
+            # spike indices are already stored by the monitors, so only
+            # record where each frame ends
+            for mon, offsets in zip(self._spike_mons, self._spike_offsets_per_ng):
+                offsets.append(int(mon.num_spikes))
+            self._n_frames += 1
 
-        # network op
         def snapshot(t):
-            i_spikes_per_ng = [
-                self._new_spikes_for_ng(i_ng) for i_ng in range(len(self.neuron_groups))
-            ]
-            self._i_spikes_per_ng_per_frame.append(i_spikes_per_ng)
-            device_values = []
-            for device in self.devices:
-                try:
-                    device_values.append(device.value)
-                # not all devices (recorders!) have a value or any changing state to plot
-                except AttributeError:
-                    device_values.append(None)
-            self._value_per_device_per_frame.append(device_values)
-
-        simulator.network.add(NetworkOperation(snapshot, dt=self.dt))
+            snapshot_spikes(t)
+            for device, values in devices_values:
+                values.append(device.value)
+
+        simulator.network.add(
+            NetworkOperation(
+                snapshot if devices_values else snapshot_spikes, dt=self.dt
+            )
+        )
 
     def connect_to_neuron_group(self, neuron_group: NeuronGroup, **kwparams) -> None:
         self.neuron_groups.append(neuron_group)
         mon = SpikeMonitor(neuron_group)
         self._spike_mons.append(mon)
         self.brian_objects.add(mon)
-        self._num_old_spikes.append(0)
+        self._spike_offsets_per_ng.append([0])
+
+    def prepare_figure(
+        self, plotargs: dict, **figargs: Any
+    ) -> tuple[plt.Figure, plt.Axes]:
+        """Plot neurons and devices on a new figure to be animated.
+
+        Called by :meth:`generate_Animation`, but can be called beforehand
+        so the same figure can be reused for multiple animations.
+
+        Parameters
+        ----------
+        plotargs : dict
+            dictionary of arguments as taken by :func:`plot`, as in
+            :meth:`generate_Animation`
+        **figargs : Any, optional
+            keyword arguments passed to plt.figure(), such as figsize
+
+        Returns
+        -------
+        tuple[plt.Figure, plt.Axes]
+            The new figure and its 3D axes, also stored in :attr:`fig`
+            and :attr:`ax`
+        """
+        self.fig = plt.figure(**figargs)
+        self.ax = self.fig.add_subplot(111, projection="3d")
+        self._neuron_artists, self._device_artists = _plot(
+            self.ax,
+            self.neuron_groups,
+            devices=self.devices,
+            **plotargs,
+        )
+        # per-neuron colors are fixed, so only the alpha column changes per frame
+        self._rgba_per_ng = []
+        for ng, artist in zip(self.neuron_groups, self._neuron_artists):
+            artist.set_alpha(None)  # remove alpha defined at collection level
+            # edges follow the face colors, so frames only need to set those
+            artist.set_edgecolor("face")
+            if artist.get_array() is not None:
+                # map values (e.g., scatterargs["c"]) to colors now, so they
+                # aren't remapped over the alpha set for each frame
+                artist.update_scalarmappable()
+                artist.set_array(None)
+            # the 3D collection's own getters depth-sort (and, before the first
+            # draw, truncate) colors, so read the base colors in neuron order
+            rgba = PathCollection.get_facecolor(artist)
+            rgba = np.broadcast_to(rgba, (ng.N, 4))
+            # colors are rendered at 8 bits per channel, so float32 loses nothing
+            rgba = np.array(rgba, dtype=np.float32)
+            rgba[:, 3] = _neuron_alpha
+            artist.set_facecolor(rgba)
+            self._rgba_per_ng.append(rgba)
+        self._shown_spikes_per_ng = [
+            np.empty(0, dtype=_spike_index_dtype(ng)) for ng in self.neuron_groups
+        ]
+        return self.fig, self.ax
 
     def generate_Animation(
-        self, plotargs: dict, slowdown_factor: float = 10, **figargs: Any
+        self,
+        plotargs: dict,
+        slowdown_factor: float = 10,
+        reuse: bool = False,
+        **figargs: Any,
     ) -> anim.Animation:
         """Create a matplotlib Animation object from the recorded simulation
 
@@ -105,6 +208,11 @@ class VideoVisualizer(InterfaceDevice):
         slowdown_factor : float, optional
             how much slower the animation will be rendered, as a multiple of
             real-time, by default 10
+        reuse : bool, optional
+            whether to animate the figure from the last call to
+            :meth:`prepare_figure` (or :meth:`generate_Animation`) rather
+            than plotting a new one, in which case `plotargs` and `figargs`
+            are ignored. By default False
         **figargs : Any, optional
             keyword arguments passed to plt.figure(), such as figsize
 
@@ -115,62 +223,177 @@ class VideoVisualizer(InterfaceDevice):
             See matplotlib's docs for saving and rendering options.
         """
         interval = self.dt * slowdown_factor
-        self.fig = plt.figure(**figargs)
-        self.ax = self.fig.add_subplot(111, projection="3d")
-        neuron_artists, device_artists = _plot(
-            self.ax,
-            self.neuron_groups,
-            devices=self.devices,
-            **plotargs,
+        if not reuse or self.fig is None:
+            self.prepare_figure(plotargs, **figargs)
+        return anim.FuncAnimation(
+            self.fig,
+            self._frame_updater(),
+            range(self._n_frames),
+            interval=interval / ms,
+            blit=True,
+            # frames are just indices into recorded data, so there's nothing to
+            # gain from keeping them around
+            cache_frame_data=False,
         )
 
+    def save_video(
+        self,
+        filename: str,
+        plotargs: dict,
+        slowdown_factor: float = 10,
+        writer: Union[str, anim.AbstractMovieWriter] = None,
+        dpi: float = None,
+        reuse: bool = False,
+        **figargs: Any,
+    ) -> None:
+        """Render the recorded simulation straight to a video file.
+
+        Faster than saving the output of :meth:`generate_Animation` since
+        frames are drawn and written one after another, without going through
+        the animation's event loop and blitting.
+
+        Parameters
+        ----------
+        filename : str
+            path of the video file to write
+        plotargs : dict
+            dictionary of arguments as taken by :func:`plot`, as in
+            :meth:`generate_Animation`
+        slowdown_factor : float, optional
+            how much slower the video will play, as a multiple of
+            real-time, by default 10
+        writer : Union[str, anim.AbstractMovieWriter], optional
+            matplotlib movie writer or name of one (e.g., "ffmpeg" or
+            "pillow"), by default ``rcParams["animation.writer"]``.
+            A writer instance keeps the fps it was created with, so
+            ``slowdown_factor`` only applies when a name is given.
+        dpi : float, optional
+            resolution of the video frames, by default
+            ``rcParams["savefig.dpi"]`` (where "figure" means the figure's
+            dpi), as in :meth:`matplotlib.animation.Animation.save`
+        reuse : bool, optional
+            whether to render the figure from the last call to
+            :meth:`prepare_figure` rather than plotting a new one, as in
+            :meth:`generate_Animation`. By default False
+        **figargs : Any, optional
+            keyword arguments passed to plt.figure(), such as figsize
+        """
+        if not reuse or self.fig is None:
+            self.prepare_figure(plotargs, **figargs)
+        update = self._frame_updater()
+        fps = 1 / float(self.dt * slowdown_factor / second)
+        if writer is None:
+            writer = plt.rcParams["animation.writer"]
+        if isinstance(writer, str):
+            writer = anim.writers[writer](fps=fps)
+        elif not np.isclose(writer.fps, fps):
+            warnings.warn(
+                f"Writer fps ({writer.fps}) overrides the {fps} fps implied by"
+                f" slowdown_factor={slowdown_factor}."
+            )
+        if dpi is None:
+            dpi = plt.rcParams["savefig.dpi"]
+        if dpi == "figure":
+            dpi = self.fig.dpi
+        with writer.saving(self.fig, filename, dpi):
+            for i in range(self._n_frames):
+                update(i)
+                writer.grab_frame()
+
+    def _frame_updater(self) -> Callable[[int], list[Artist]]:
+        """Returns a function that updates the artists in :attr:`fig` to
+        show the given frame and returns the ones to redraw."""
+        # bind this figure's artists, color buffers, and shown spikes, so
+        # animations of earlier figures keep updating their own after
+        # prepare_figure
+        neuron_artists = self._neuron_artists
+        rgba_per_ng = self._rgba_per_ng
+        shown_spikes_per_ng = self._shown_spikes_per_ng
+        # one contiguous array of spike indices per neuron group, sliced per frame
+        self._i_spikes_per_ng = [
+            np.asarray(mon.i[:], dtype=_spike_index_dtype(ng))
+            for ng, mon in zip(self.neuron_groups, self._spike_mons)
+        ]
+
+        # bind each device's update method to its artists once, not every frame,
+        # skipping devices with no value to update them with
+        updaters = [
+            (device.update_artists, artists, values)
+            for device, artists, values in zip(
+                _unpack_devices(self.devices),
+                self._device_artists,
+                self._values_per_device,
+            )
+            if values is not None
+        ]
+
         def update(i):
-            prev_device_values = self._value_per_device_per_frame[i - 1]
-            device_values = self._value_per_device_per_frame[i]
             updated_artists = []
-            for device, artists, value, prev_value in zip(
-                self.devices, device_artists, device_values, prev_device_values
-            ):
-                if np.allclose(value, prev_value):
+            for update_artists, artists, values in updaters:
+                if np.allclose(values[i], values[i - 1]):
                     continue
-                updated_artists_for_device = device.update_artists(artists, value)
-                updated_artists.extend(updated_artists_for_device)
-            self._update_neuron_artists_for_frame(neuron_artists, i)
+                updated_artists.extend(update_artists(artists, values[i]))
+            self._update_neuron_artists_for_frame(
+                neuron_artists, rgba_per_ng, shown_spikes_per_ng, i
+            )
             return updated_artists + neuron_artists
 
-        return anim.FuncAnimation(
-            self.fig,
-            update,
-            range(len(self._value_per_device_per_frame)),
-            interval=interval / ms,
-            blit=True,
-        )
+        return update
 
-    def _update_neuron_artists_for_frame(self, artists, i_frame):
-        i_spikes_per_ng = self._i_spikes_per_ng_per_frame[i_frame]
+    def _update_neuron_artists_for_frame(
+        self, artists, rgba_per_ng, shown_spikes_per_ng, i_frame
+    ):
         # loop over neuron groups/artists
-        for i_spikes, ng, artist in zip(i_spikes_per_ng, self.neuron_groups, artists):
-            spike_counts = self._spikes_i_to_count_for_ng(i_spikes, ng)
-            artist.set_alpha(None)  # remove alpha defined at collection level
-            rgba = artist.get_edgecolor()
-            alpha = np.zeros(ng.N)
-            alpha[spike_counts == 0] = _neuron_alpha
-            alpha[spike_counts > 0] = 1
-            rgba[:, 3] = alpha
+        for i_ng, (i_spikes_all, offsets, rgba, artist) in enumerate(
+            zip(
+                self._i_spikes_per_ng,
+                self._spike_offsets_per_ng,
+                rgba_per_ng,
+                artists,
+            )
+        ):
+            i_prev_spikes = shown_spikes_per_ng[i_ng]
+            i_spikes = i_spikes_all[offsets[i_frame] : offsets[i_frame + 1]]
+            if len(i_spikes) == 0 and len(i_prev_spikes) == 0:
+                continue  # nothing to change from the frame already shown
+            # spiking neurons are opaque, the rest faded
+            if numba_available:
+                _update_alpha_column(rgba, i_prev_spikes, i_spikes, _neuron_alpha)
+            else:
+                _update_alpha_column_numpy(rgba, i_prev_spikes, i_spikes, _neuron_alpha)
+            shown_spikes_per_ng[i_ng] = i_spikes
             # warning: this doesn't work. gets order wrong: artist.set_alpha(alpha)
-            artist.set_color(rgba)
+            artist.set_facecolor(rgba)
+
+
+def _unpack_devices(
+    devices: Iterable[Union[InterfaceDevice, Tuple[InterfaceDevice, dict]]]
+) -> list[InterfaceDevice]:
+    """Strips plot kwargs from (device, kwargs) tuples, as accepted by :func:`plot`."""
+    return [item[0] if isinstance(item, tuple) else item for item in devices]
+
+
+def _spike_index_dtype(ng: NeuronGroup) -> np.dtype:
+    """Smallest unsigned integer type holding every index in ``ng``, used to
+    store its spikes for animation (e.g., 1 byte per spike for N <= 256)."""
+    return np.min_scalar_type(max(ng.N - 1, 0))
+
+
+@njit(cache=True)
+def _update_alpha_column(rgba, i_prev_spikes, i_spikes, baseline_alpha):
+    """Updates the alpha column of ``rgba`` in place, from showing ``i_prev_spikes``
+    to showing ``i_spikes``: the former are reset to ``baseline_alpha``, then
+    the latter set to 1. Compiled with numba."""
+    for k in range(i_prev_spikes.size):
+        rgba[i_prev_spikes[k], 3] = baseline_alpha
+    for k in range(i_spikes.size):
+        rgba[i_spikes[k], 3] = 1.0
 
-    def _spikes_i_to_count_for_ng(self, i_spikes, ng):
-        counts = np.zeros(ng.N)
-        counts[i_spikes] = 1
-        return counts
 
-    def _new_spikes_for_ng(self, i_ng):
-        mon = self._spike_mons[i_ng]
-        num_old = self._num_old_spikes[i_ng]
-        new_i_spikes = mon.i[num_old:]
-        self._num_old_spikes[i_ng] = len(mon.i)
-        return new_i_spikes
+def _update_alpha_column_numpy(rgba, i_prev_spikes, i_spikes, baseline_alpha):
+    """NumPy version of :func:`_update_alpha_column`, used without numba."""
+    rgba[i_prev_spikes, 3] = baseline_alpha
+    rgba[i_spikes, 3] = 1
 
 
 def _plot(
@@ -191,10 +414,16 @@ def _plot(
                 raise ValueError(f"{ng.name} does not have dimension {dim} defined.")
 
     assert colors is None or len(colors) == len(neuron_groups)
+    # scale all coordinates at once, then take each group's (3, N) slice
+    i_starts = np.cumsum([0] + [ng.N for ng in neuron_groups])
+    xyz_all = np.empty((i_starts[-1], 3))
+    for ng, i_start in zip(neuron_groups, i_starts):
+        xyz_all[i_start : i_start + ng.N] = _unitless_coords_from_ng(ng)
+    xyz_all = xyz_all.T / float(axis_scale_unit / meter)
     neuron_artists = []
     for i in range(len(neuron_groups)):
         ng = neuron_groups[i]
-        xyz = [ng.x / axis_scale_unit, ng.y / axis_scale_unit, ng.z / axis_scale_unit]
+        xyz = list(xyz_all[:, i_starts[i] : i_starts[i + 1]])
         # mask neurons outside desired lims:
         for i_dim, lim in enumerate([xlim, ylim, zlim]):
             if lim is not None:
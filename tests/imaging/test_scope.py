@@ -124,6 +124,57 @@ def test_target_neurons_in_plane(rand_seed):
     # TODO: random rotations
 
 
+@pytest.mark.parametrize("sensor_location", ["cytoplasm", "membrane"])
+def test_targets_kernel_matches_numpy(rand_seed, sensor_location):
+    from cleo.imaging.scope import (
+        _targets_kernel,
+        _targets_kernel_parallel,
+        _targets_numpy,
+    )
+
+    rng = np.random.default_rng(rand_seed)
+    ng_coords = rng.uniform(-200e-6, 200e-6, (1000, 3))
+    plane_normal = np.array([0.3, -0.2, 1])
+    plane_normal /= np.linalg.norm(plane_normal)
+    plane_center = 20e-6 * plane_normal
+    args = (
+        ng_coords,
+        plane_center,
+        plane_normal,
+        10e-6,
+        300e-6,
+        sensor_location == "cytoplasm",
+    )
+    i_kernel, nff_kernel, cop_kernel = _targets_kernel(*args)
+    i_np, nff_np, cop_np = _targets_numpy(*args)
+    assert len(i_kernel) > 0
+    assert np.all(i_kernel == i_np)
+    assert np.allclose(nff_kernel, nff_np)
+    assert np.allclose(cop_kernel, cop_np)
+
+    i_par, nff_par, cop_par = _targets_kernel_parallel(*args)
+    assert np.all(i_par == i_kernel)
+    assert np.all(nff_par == nff_kernel)
+    assert np.all(cop_par == cop_kernel)
+
+
+def test_scope_get_state(monkeypatch):
+    ng1 = NeuronGroup(10, "dv/dt = -v / (10*ms) : 1", threshold="v > 1", name="ng1")
+    ng2 = NeuronGroup(10, "dv/dt = -v / (10*ms) : 1", threshold="v > 1", name="ng2")
+    assign_xyz(ng1, 0, 0, 0)
+    assign_xyz(ng2, 0, 0, 0)
+    scope = Scope(sensor=gcamp6f(), img_width=500 * um)
+    sim = cleo.CLSimulator(Network(ng1, ng2))
+    for ng, i_targets in [(ng1, [0, 1, 2]), (ng2, [3, 4]), (ng1, [7, 8])]:
+        sim.inject(scope, ng, i_targets=i_targets, sigma_noise=0)
+    scope.inject_sensor_for_targets()
+
+    # sensor signal for each ng is ordered by that ng's targets across injections
+    signal_per_ng = {"ng1": np.array([10, 11, 12, 17, 18]), "ng2": np.array([23, 24])}
+    monkeypatch.setattr(type(scope.sensor), "get_state", lambda self: signal_per_ng)
+    assert np.all(scope.get_state() == [10, 11, 12, 23, 24, 17, 18])
+
+
 @pytest.mark.parametrize("regular", [True, False])
 def test_scope_to_neo(regular):
     scope = Scope(
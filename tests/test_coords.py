@@ -112,5 +112,15 @@ def test_init_vars_for_subgroup():
     sg2.x
 
 
+def test_coords_from_ng():
+    ng = NeuronGroup(4, "v=0: volt")
+    coords.assign_xyz(ng, [0, 1, 2, 3], [4, 5, 6, 7], [8, 9, 10, 11])
+    assert np.all(coords.coords_from_ng(ng) == coords.coords_from_xyz(ng.x, ng.y, ng.z))
+    assert np.all(coords.coords_from_ng(ng[1:3]) == coords.coords_from_ng(ng)[1:3])
+    # reflects coordinates reassigned after first access
+    ng.z = 1 * mm
+    assert np.all(coords.coords_from_ng(ng)[:, 2] == 1 * mm)
+
+
 if __name__ == "__main__":
     pytest.main(["-xs", "--lf", __file__])
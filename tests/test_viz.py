@@ -1,8 +1,13 @@
 import itertools
 
 import matplotlib.pyplot as plt
+import numpy as np
 import pytest
 from brian2 import Network, NeuronGroup, mm, mm2, ms, mwatt
+from matplotlib.animation import PillowWriter
+from matplotlib.collections import PathCollection
+from matplotlib.colors import to_rgb
+from PIL import Image
 
 import cleo
 from cleo import CLSimulator
@@ -44,6 +49,128 @@ def test_VideoVisualizer():
     ani = vv.generate_Animation(plotargs)
 
 
+@pytest.mark.slow
+def test_VideoVisualizer_renders_devices():
+    ng = NeuronGroup(
+        5,
+        """v : volt
+        Iopto : amp""",
+        threshold="v > 1 * volt",
+        reset="v = 0 * volt",
+    )
+    assign_xyz(ng, 0, 0, 0)
+    light = Light(light_model=fiber473nm(), max_value=20 * mwatt / mm2)
+    probe = Probe([(0, 0, 0.1)] * mm)
+    sim = CLSimulator(Network(ng)).inject(light, ng).inject(probe, ng)
+    # probe is a recorder with no value to animate
+    vv = VideoVisualizer(devices=[(light, {"n_points_per_source": 10}), probe])
+    sim.inject(vv, ng)
+    sim.run(3 * ms)
+
+    ani = vv.generate_Animation({})
+    # draws every frame
+    ani.to_jshtml()
+
+    fig, ax = vv.fig, vv.ax
+    ani = vv.generate_Animation({}, slowdown_factor=1, reuse=True)
+    assert vv.fig is fig and vv.ax is ax
+    ani.to_jshtml()
+    plt.close(fig)
+
+
+@pytest.mark.slow
+@pytest.mark.parametrize("c", [np.linspace(0, 1, 18).reshape(6, 3), np.arange(6)])
+def test_VideoVisualizer_per_neuron_colors(c):
+    ng = NeuronGroup(6, "v : volt", threshold="v > 1 * volt", reset="v = 0 * volt")
+    assign_xyz(ng, np.arange(6) * 0.1, 0, np.arange(6) * 0.1, unit=mm)
+    sim = CLSimulator(Network(ng))
+    vv = VideoVisualizer(devices=[])
+    sim.inject(vv, ng)
+    sim.run(3 * ms)
+
+    ani = vv.generate_Animation({"scatterargs": {"c": c}})
+    ani.to_jshtml()
+    rgba = vv._rgba_per_ng[0]
+    assert rgba.shape == (6, 4)
+    if c.ndim == 2:
+        # colors kept in neuron order
+        assert np.allclose(rgba[:, :3], c)
+    else:
+        assert len(np.unique(rgba[:, :3], axis=0)) == 6
+    plt.close(vv.fig)
+
+
+@pytest.mark.slow
+def test_VideoVisualizer_figures_independent():
+    # neuron k spikes in frame 2k + 2
+    ng = NeuronGroup(4, "v : 1", threshold="abs(t - (2 * i + 1.5) * ms) < 0.05 * ms")
+    assign_xyz(ng, np.arange(4) * 0.1, 0, 0, unit=mm)
+    sim = CLSimulator(Network(ng))
+    vv = VideoVisualizer(devices=[])
+    sim.inject(vv, ng)
+    sim.run(10 * ms)
+
+    ani_red = vv.generate_Animation({"colors": ["red"]})
+    fig_red, artist_red = vv.fig, vv._neuron_artists[0]
+    ani_red._func(2)  # neuron 0 shown spiking
+    vv.generate_Animation({"colors": ["blue"]})
+    # a new figure doesn't change what earlier animations draw
+    for i in [1, *range(10)]:
+        ani_red._func(i)
+        rgba = PathCollection.get_facecolor(artist_red)
+        assert np.allclose(rgba[:, :3], to_rgb("red"))
+        expected_alpha = np.full(4, 0.2)
+        if i % 2 == 0 and 2 <= i <= 8:
+            expected_alpha[i // 2 - 1] = 1
+        assert np.allclose(rgba[:, 3], expected_alpha)
+    plt.close(fig_red)
+    plt.close(vv.fig)
+
+
+@pytest.mark.slow
+def test_VideoVisualizer_save_video(tmp_path):
+    ng = NeuronGroup(5, "v : volt", threshold="v > 1 * volt", reset="v = 0 * volt")
+    assign_xyz(ng, 0, 0, 0)
+    light = Light(light_model=fiber473nm(), max_value=20 * mwatt / mm2)
+    sim = CLSimulator(Network(ng)).inject(light, ng)
+    vv = VideoVisualizer(devices=[light])
+    sim.inject(vv, ng)
+    sim.run(3 * ms)
+
+    filename = tmp_path / "video.gif"
+    vv.save_video(filename, {}, writer="pillow", dpi=30)
+    assert filename.stat().st_size > 0
+
+    # dpi defaults to savefig.dpi, as in Animation.save
+    with plt.rc_context({"savefig.dpi": 20}):
+        vv.save_video(filename, {}, writer="pillow", reuse=True)
+    with Image.open(filename) as im:
+        assert im.size == tuple(np.round(vv.fig.get_size_inches() * 20))
+
+    # writer instance keeps its own fps
+    with pytest.warns(UserWarning, match="fps"):
+        vv.save_video(filename, {}, writer=PillowWriter(fps=5), dpi=30, reuse=True)
+    plt.close(vv.fig)
+
+
+def test_update_alpha_column_matches_numpy(rand_seed):
+    from cleo.viz import _update_alpha_column, _update_alpha_column_numpy
+
+    rng = np.random.default_rng(rand_seed)
+    rgba = rng.uniform(size=(100, 4)).astype(np.float32)
+    i_prev_spikes = rng.choice(100, 10, replace=False).astype(np.int32)
+    rgba[:, 3] = 0.2
+    rgba[i_prev_spikes, 3] = 1
+    rgba_np = rgba.copy()
+    i_spikes = rng.choice(100, 10, replace=False).astype(np.int32)
+    _update_alpha_column(rgba, i_prev_spikes, i_spikes, 0.2)
+    _update_alpha_column_numpy(rgba_np, i_prev_spikes, i_spikes, 0.2)
+    assert np.all(rgba == rgba_np)
+    expected = np.full(100, 0.2, dtype=np.float32)
+    expected[i_spikes] = 1
+    assert np.all(rgba[:, 3] == expected)
+
+
 @pytest.mark.slow
 @pytest.mark.filterwarnings("ignore:No artists with labels.*legend")
 def test_plot_sim():